@@ -22,17 +22,24 @@ locale su file JSON.
 from __future__ import annotations
 
 import asyncio
+import concurrent.futures
 import contextlib
-import json
+import hashlib
+import heapq
+import hmac
+import itertools
 import logging
 import os
-from dataclasses import dataclass, field, asdict
+import time
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
 import aiohttp
 import discord
+import orjson
+from aiohttp import web
 from discord.ext import commands, tasks
 from dotenv import load_dotenv
 
@@ -53,6 +60,7 @@ if not DISCORD_TOKEN:
 
 DASHBOARD_BASE_URL = os.getenv("DASHBOARD_BASE_URL", "http://localhost:8000")
 DASHBOARD_API_KEY = os.getenv("DASHBOARD_API_KEY", "")
+NOTIFIER_WEBHOOK_PORT = int(os.getenv("NOTIFIER_WEBHOOK_PORT", "8090"))
 
 CONFIG_FILE = BASE_DIR / "config.json"
 REMINDERS_FILE = BASE_DIR / "reminders.json"
@@ -61,7 +69,7 @@ UTC = timezone.utc
 # ========================= Data structures ==============================
 
 
-@dataclass
+@dataclass(slots=True)
 class FreezeSettings:
     enabled: bool = True
     debounce_seconds: int = 1
@@ -70,8 +78,19 @@ class FreezeSettings:
     quiet_gap_seconds: int = 5
     max_batch_remove: int = 10
 
+    def _dict(self) -> Dict[str, Any]:
+        # Letterale esplicito: niente riflessione/deep-copy di asdict.
+        return {
+            "enabled": self.enabled,
+            "debounce_seconds": self.debounce_seconds,
+            "pause_start_delay": self.pause_start_delay,
+            "accumulate_window_seconds": self.accumulate_window_seconds,
+            "quiet_gap_seconds": self.quiet_gap_seconds,
+            "max_batch_remove": self.max_batch_remove,
+        }
+
 
-@dataclass
+@dataclass(slots=True)
 class VerificationSettings:
     guild_id: int = 0
     verify_channel_id: int = 0
@@ -84,6 +103,33 @@ class VerificationSettings:
         "Benvenuto! Completa la verifica seguendo le istruzioni del modulo "
         "sulla dashboard."
     )
+    _welcome_parts: List[str] = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self._compile_welcome()
+
+    def _compile_welcome(self) -> None:
+        # Template spezzato una volta sola: on_member_join concatena i pezzi
+        # invece di riscandire il messaggio con str.replace a ogni join.
+        self._welcome_parts = self.welcome_message.split("{member}", 1)
+
+    def format_welcome(self, mention: str) -> str:
+        parts = self._welcome_parts
+        if len(parts) == 2:
+            return parts[0] + mention + parts[1]
+        return parts[0]
+
+    def _dict(self) -> Dict[str, Any]:
+        return {
+            "guild_id": self.guild_id,
+            "verify_channel_id": self.verify_channel_id,
+            "staff_log_channel_id": self.staff_log_channel_id,
+            "verified_role_id": self.verified_role_id,
+            "unverified_role_id": self.unverified_role_id,
+            "min_age": self.min_age,
+            "timeout_minutes": self.timeout_minutes,
+            "welcome_message": self.welcome_message,
+        }
 
     def merge(self, payload: Dict[str, Any]) -> None:
         for key in (
@@ -97,35 +143,45 @@ class VerificationSettings:
         ):
             if key in payload and payload[key] is not None:
                 setattr(self, key, payload[key])
+        self._compile_welcome()
 
 
-@dataclass
+@dataclass(slots=True)
 class Reminder:
     author_id: int
     channel_id: int
     message: str
     trigger_at: datetime
+    _iso: str = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        # I timestamp naive (file legacy) vengono normalizzati a UTC qui,
+        # così ogni Reminder in vita è tz-aware e confrontabile nel heap.
+        if self.trigger_at.tzinfo is None:
+            self.trigger_at = self.trigger_at.replace(tzinfo=UTC)
+        # Formattato una volta sola: i salvataggi ripetuti non devono
+        # riconvertire lo stesso datetime a ogni flush.
+        self._iso = self.trigger_at.isoformat()
 
     def to_dict(self) -> Dict[str, Any]:
         return {
             "author_id": self.author_id,
             "channel_id": self.channel_id,
             "message": self.message,
-            "trigger_at": self.trigger_at.astimezone(UTC).isoformat(),
+            "trigger_at": self._iso,
         }
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "Reminder":
-        trigger = datetime.fromisoformat(data["trigger_at"])
         return cls(
             author_id=data["author_id"],
             channel_id=data["channel_id"],
             message=data["message"],
-            trigger_at=trigger,
+            trigger_at=datetime.fromisoformat(data["trigger_at"]),
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class NotifierTarget:
     platform: str
     url: str
@@ -139,11 +195,13 @@ class NotifierTarget:
         return cls(platform=data["platform"], url=data["url"], role_id=data.get("role_id"))
 
 
-@dataclass
+@dataclass(slots=True)
 class NotifierSettings:
     enabled: bool = False
     notify_channel_id: int = 0
-    targets: List[NotifierTarget] = field(default_factory=list)
+    # Indicizzati per (platform, url): lookup O(1) e merge incrementale
+    # senza ricreare i NotifierTarget a ogni refresh della dashboard.
+    targets: Dict[tuple, NotifierTarget] = field(default_factory=dict)
 
     def merge(self, data: Dict[str, Any]) -> None:
         if "enabled" in data:
@@ -151,17 +209,26 @@ class NotifierSettings:
         if "notify_channel_id" in data:
             self.notify_channel_id = int(data["notify_channel_id"] or 0)
         if "targets" in data and isinstance(data["targets"], list):
-            self.targets = [NotifierTarget.from_dict(t) for t in data["targets"]]
+            incoming = {(t["platform"], t["url"]): t for t in data["targets"]}
+            for key in list(self.targets):
+                if key not in incoming:
+                    del self.targets[key]
+            for key, raw in incoming.items():
+                target = self.targets.get(key)
+                if target is None:
+                    self.targets[key] = NotifierTarget.from_dict(raw)
+                else:
+                    target.role_id = raw.get("role_id")
 
     def to_dict(self) -> Dict[str, Any]:
         return {
             "enabled": self.enabled,
             "notify_channel_id": self.notify_channel_id,
-            "targets": [t.to_dict() for t in self.targets],
+            "targets": [t.to_dict() for t in self.targets.values()],
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class BotConfig:
     guild_id: int
     prefix: str = "!"
@@ -209,6 +276,8 @@ class ConfigManager:
     def __init__(self, file_path: Path):
         self.file_path = file_path
         self._config = BotConfig(guild_id=int(os.getenv("GUILD_ID", "0") or 0))
+        self._dirty = False
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
         self.load()
         self._config.verification.guild_id = self._config.guild_id
 
@@ -222,8 +291,7 @@ class ConfigManager:
             self.save()
             return
         try:
-            with self.file_path.open("r", encoding="utf-8") as fp:
-                data = json.load(fp)
+            data = orjson.loads(self.file_path.read_bytes())
         except Exception as exc:  # pragma: no cover - log di emergenza
             log.error("Impossibile caricare la configurazione: %s", exc)
             return
@@ -231,62 +299,133 @@ class ConfigManager:
         self._config.verification.guild_id = self._config.guild_id
         log.info("Configurazione caricata (prefix=%s)", self._config.prefix)
 
-    def save(self) -> None:
-        data = {
+    def _to_dict(self) -> Dict[str, Any]:
+        return {
             "guild_id": self._config.guild_id,
             "prefix": self._config.prefix,
             "dashboard_sync_interval": self._config.dashboard_sync_interval,
-            "freeze": asdict(self._config.freeze),
-            "verification": asdict(self._config.verification),
+            "freeze": self._config.freeze._dict(),
+            "verification": self._config.verification._dict(),
             "notifier": self._config.notifier.to_dict(),
         }
-        with self.file_path.open("w", encoding="utf-8") as fp:
-            json.dump(data, fp, ensure_ascii=False, indent=2)
+
+    def save(self) -> None:
+        """Scrittura immediata (usata in fase di bootstrap, fuori dall'event loop)."""
+        self._flush_sync()
+
+    def mark_dirty(self) -> None:
+        """Coalizza più salvataggi ravvicinati in un'unica scrittura su disco."""
+        self._dirty = True
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._flush_sync()
+            return
+        if self._flush_handle is None:
+            self._flush_handle = loop.call_later(0.5, self._flush)
+
+    def _flush(self) -> None:
+        self._flush_handle = None
+        if self._dirty:
+            asyncio.get_running_loop().create_task(self.save_async())
+
+    async def save_async(self) -> None:
+        """Scrive su disco dal worker I/O dedicato, senza bloccare l'event loop."""
+        await asyncio.get_running_loop().run_in_executor(_IO_EXECUTOR, self._flush_sync)
+
+    def _flush_sync(self) -> None:
+        self._dirty = False
+        blob = orjson.dumps(self._to_dict(), option=orjson.OPT_INDENT_2)
+        _write_bytes_atomic(self.file_path, blob)
         log.debug("Configurazione salvata su %s", self.file_path)
 
     def update_from_dashboard(self, payload: Dict[str, Any]) -> BotConfig:
         log.info("Merge configurazione da dashboard")
         self._config.merge(payload)
         self._config.verification.guild_id = self._config.guild_id
-        self.save()
+        self.mark_dirty()
         return self._config
 
 
 # ========================= Dashboard bridge ============================
 
+_SHARED_SESSION: Optional[aiohttp.ClientSession] = None
+
+
+async def get_http_session() -> aiohttp.ClientSession:
+    """Sessione HTTP condivisa da tutto il bot.
+
+    Un solo pool di connessioni (keep-alive, DNS cache) verso la dashboard:
+    gli handshake TCP/TLS vengono ammortizzati tra fetch_config, push_event e
+    push_metrics invece di ripeterli per ogni componente.
+    """
+    global _SHARED_SESSION
+    if _SHARED_SESSION is None or _SHARED_SESSION.closed:
+        _SHARED_SESSION = aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=15),
+            connector=aiohttp.TCPConnector(
+                limit=50,
+                limit_per_host=20,
+                ttl_dns_cache=300,
+                keepalive_timeout=75,
+            ),
+        )
+    return _SHARED_SESSION
+
+
+async def close_http_session() -> None:
+    if _SHARED_SESSION and not _SHARED_SESSION.closed:
+        await _SHARED_SESSION.close()
+
 
 class DashboardBridge:
     """Gestisce la comunicazione con il backend della dashboard."""
 
+    #: finestra entro cui fetch_config ravvicinate riusano l'ultima risposta
+    CONFIG_TTL = 10.0
+
     def __init__(self, base_url: str, api_key: str):
         self.base_url = base_url.rstrip("/")
         self.api_key = api_key
-        self.session: Optional[aiohttp.ClientSession] = None
         self._default_headers = {
             "User-Agent": "LegnaBot/2",
             "Content-Type": "application/json",
         }
         if self.api_key:
             self._default_headers["Authorization"] = f"Bearer {self.api_key}"
+        self._event_q: "asyncio.Queue[tuple[int, str, Dict[str, Any]]]" = asyncio.Queue()
+        self._drain_task: Optional[asyncio.Task] = None
+        self._cfg_cache: Optional[tuple[float, Dict[str, Any]]] = None
+        self._cfg_etag: Optional[str] = None
 
     async def ensure_session(self) -> aiohttp.ClientSession:
-        if self.session and not self.session.closed:
-            return self.session
-        timeout = aiohttp.ClientTimeout(total=15)
-        self.session = aiohttp.ClientSession(timeout=timeout)
-        return self.session
+        return await get_http_session()
 
     async def close(self) -> None:
-        if self.session and not self.session.closed:
-            await self.session.close()
+        if self._drain_task and not self._drain_task.done():
+            self._drain_task.cancel()
+        await close_http_session()
 
     async def fetch_config(self, guild_id: int) -> Optional[Dict[str, Any]]:
+        now = time.monotonic()
+        if self._cfg_cache and now - self._cfg_cache[0] < self.CONFIG_TTL:
+            return self._cfg_cache[1]
         session = await self.ensure_session()
         url = f"{self.base_url}/api/bots/{guild_id}/config"
+        headers = self._default_headers
+        if self._cfg_etag:
+            headers = dict(headers)
+            headers["If-None-Match"] = self._cfg_etag
         try:
-            async with session.get(url, headers=self._default_headers) as resp:
+            async with session.get(url, headers=headers) as resp:
+                if resp.status == 304 and self._cfg_cache:
+                    # Config invariata lato dashboard: nessun body da riparsare.
+                    self._cfg_cache = (now, self._cfg_cache[1])
+                    return self._cfg_cache[1]
                 if resp.status == 200:
                     data = await resp.json()
+                    self._cfg_etag = resp.headers.get("ETag")
+                    self._cfg_cache = (now, data)
                     log.info("Configurazione remota ricevuta dalla dashboard")
                     return data
                 log.warning("Dashboard config GET %s -> %s", url, resp.status)
@@ -295,22 +434,59 @@ class DashboardBridge:
         return None
 
     async def push_event(self, guild_id: int, event: str, payload: Dict[str, Any]) -> None:
+        """Accoda l'evento: un task in background lo invia in batch.
+
+        Durante i burst (raid di join, verifiche in serie) gli eventi vengono
+        raggruppati in un'unica POST invece di una richiesta per evento.
+        """
+        if self._drain_task is None or self._drain_task.done():
+            self._drain_task = asyncio.create_task(self._drain_events())
+        await self._event_q.put((guild_id, event, payload))
+
+    async def _drain_events(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._event_q.get()]
+            # Scadenza fissa per il batch: un timeout per singola get si
+            # azzererebbe a ogni evento e un flusso continuo rimanderebbe
+            # il flush fino al limite di 50.
+            deadline = loop.time() + 1.0
+            while len(batch) < 50:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._event_q.get(), timeout=timeout))
+                except asyncio.TimeoutError:
+                    break
+            await self._post_event_batch(batch)
+
+    async def _post_event_batch(self, batch: List[tuple]) -> None:
         session = await self.ensure_session()
-        url = f"{self.base_url}/api/bots/{guild_id}/events"
-        body = {"event": event, "payload": payload, "timestamp": datetime.utcnow().isoformat()}
-        try:
-            async with session.post(url, json=body, headers=self._default_headers) as resp:
-                if resp.status >= 400:
-                    log.warning("Dashboard event POST %s -> %s", event, resp.status)
-        except Exception as exc:
-            log.error("Errore nell'invio evento alla dashboard: %s", exc)
+        # Un unico timestamp (tz-aware) per batch: gli eventi condividono la
+        # stessa stringa invece di formattare un datetime ciascuno.
+        timestamp = datetime.now(UTC).isoformat(timespec="milliseconds")
+        by_guild: Dict[int, List[Dict[str, Any]]] = {}
+        for guild_id, event, payload in batch:
+            by_guild.setdefault(guild_id, []).append({"event": event, "payload": payload})
+        for guild_id, events in by_guild.items():
+            url = f"{self.base_url}/api/bots/{guild_id}/events:batch"
+            body = {"events": events, "timestamp": timestamp}
+            try:
+                # data=orjson.dumps salta il serializzatore json di aiohttp;
+                # il Content-Type è già nei default headers.
+                async with session.post(url, data=orjson.dumps(body), headers=self._default_headers) as resp:
+                    if resp.status >= 400:
+                        log.warning("Dashboard events POST (%d eventi) -> %s", len(events), resp.status)
+            except Exception as exc:
+                log.error("Errore nell'invio eventi alla dashboard: %s", exc)
 
     async def push_metrics(self, guild_id: int, metrics: Dict[str, Any]) -> None:
         session = await self.ensure_session()
         url = f"{self.base_url}/api/bots/{guild_id}/metrics"
-        payload = {"metrics": metrics, "timestamp": datetime.utcnow().isoformat()}
+        payload = {"metrics": metrics, "timestamp": datetime.now(UTC).isoformat(timespec="milliseconds")}
         try:
-            async with session.post(url, json=payload, headers=self._default_headers) as resp:
+            async with session.post(url, data=orjson.dumps(payload), headers=self._default_headers) as resp:
                 if resp.status >= 400:
                     log.warning("Dashboard metrics POST -> %s", resp.status)
         except Exception as exc:
@@ -319,6 +495,21 @@ class DashboardBridge:
 
 # ========================= Utility =====================================
 
+# Un solo worker dedicato all'I/O su file: le scritture restano ordinate
+# senza bisogno di lock e non passano dal thread pool di default.
+_IO_EXECUTOR = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="legna-io")
+
+
+def _write_bytes_atomic(path: Path, blob: bytes) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(blob)
+    os.replace(tmp, path)
+
+
+async def write_json_atomic(path: Path, obj: Any) -> None:
+    blob = orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    await asyncio.get_running_loop().run_in_executor(_IO_EXECUTOR, _write_bytes_atomic, path, blob)
+
 
 def human_delta(target: datetime) -> str:
     now = datetime.now(UTC)
@@ -346,11 +537,46 @@ class DashboardSyncCog(commands.Cog):
         self.bot = bot
         self.config_manager = config_manager
         self.bridge = bridge
+        self._online_count = 0
+
+    async def cog_load(self) -> None:
+        # Come per i task degli altri cog: il loop parte dal hook
+        # asincrono, quando un event loop esiste davvero.
         self.metrics_updater.start()
 
     def cog_unload(self) -> None:
         self.metrics_updater.cancel()
 
+    @commands.Cog.listener()
+    async def on_ready(self) -> None:
+        # Scan unico alla connessione: da qui in poi il contatore viene
+        # mantenuto dagli eventi di presenza invece di riscandire la cache.
+        guild = self.bot.get_guild(self.config_manager.config.guild_id)
+        if guild:
+            # raw_status è una stringa-slot sul Member: confronto PyUnicode
+            # diretto invece della catena di confronto dell'enum Status.
+            self._online_count = sum(1 for m in guild.members if m.raw_status != "offline")
+
+    @commands.Cog.listener()
+    async def on_presence_update(self, before: discord.Member, after: discord.Member) -> None:
+        if after.guild.id != self.config_manager.config.guild_id:
+            return
+        offline = discord.Status.offline
+        if before.status == offline and after.status != offline:
+            self._online_count += 1
+        elif before.status != offline and after.status == offline:
+            self._online_count = max(0, self._online_count - 1)
+
+    @commands.Cog.listener()
+    async def on_member_join(self, member: discord.Member) -> None:
+        if member.guild.id == self.config_manager.config.guild_id and member.status != discord.Status.offline:
+            self._online_count += 1
+
+    @commands.Cog.listener()
+    async def on_member_remove(self, member: discord.Member) -> None:
+        if member.guild.id == self.config_manager.config.guild_id and member.status != discord.Status.offline:
+            self._online_count = max(0, self._online_count - 1)
+
     async def sync_config(self, reason: str) -> None:
         cfg = self.config_manager.config
         if not cfg.guild_id:
@@ -359,6 +585,9 @@ class DashboardSyncCog(commands.Cog):
         payload = await self.bridge.fetch_config(cfg.guild_id)
         if payload:
             self.config_manager.update_from_dashboard(payload)
+            # Gli id di canali/ruoli possono essere cambiati: i cog che li
+            # hanno memoizzati devono invalidare le proprie cache.
+            self.bot.dispatch("config_reloaded")
             await self.bridge.push_event(
                 cfg.guild_id,
                 "config_synced",
@@ -367,7 +596,6 @@ class DashboardSyncCog(commands.Cog):
 
     @tasks.loop(seconds=60)
     async def metrics_updater(self) -> None:
-        await self.bot.wait_until_ready()
         cfg = self.config_manager.config
         if not cfg.guild_id:
             return
@@ -376,7 +604,7 @@ class DashboardSyncCog(commands.Cog):
             return
         metrics = {
             "member_count": guild.member_count,
-            "online_members": sum(1 for m in guild.members if m.status != discord.Status.offline),
+            "online_members": self._online_count,
             "pending_verifications": len(getattr(self.bot, "pending_verifications", {})),
             "reminders": len(getattr(self.bot, "reminders", [])),
         }
@@ -407,31 +635,68 @@ class VerificationCog(commands.Cog):
         self.config_manager = config_manager
         self.bridge = bridge
         self.pending: Dict[int, datetime] = {}
+        # Min-heap di (scadenza, member_id, join): il task di cleanup dorme
+        # fino alla prima scadenza invece di scandire pending ogni minuto.
+        # Il timestamp di join distingue la voce dal pending di un eventuale
+        # rientro successivo dello stesso membro.
+        self._expiry: List[tuple] = []
+        self._expiry_wakeup = asyncio.Event()
+        # Canali/ruoli risolti una volta sola: gli id sono stabili fino al
+        # prossimo reload della configurazione.
+        self._resolved: Dict[tuple, Any] = {}
+        self._cleanup_task: Optional[asyncio.Task] = None
         bot.pending_verifications = self.pending
-        self.cleanup_task.start()
+
+    async def cog_load(self) -> None:
+        # bot.loop non è accessibile prima del login (discord.py 2.x):
+        # il task parte dal hook asincrono, non dal costruttore.
+        self._cleanup_task = asyncio.create_task(self._cleanup_loop())
 
     def cog_unload(self) -> None:
-        self.cleanup_task.cancel()
+        if self._cleanup_task is not None:
+            self._cleanup_task.cancel()
 
-    async def assign_role(self, member: discord.Member, role_id: int) -> None:
+    @commands.Cog.listener()
+    async def on_config_reloaded(self) -> None:
+        self._resolved.clear()
+
+    def _resolve_role(self, guild: discord.Guild, role_id: int) -> Optional[discord.Role]:
         if not role_id:
-            return
-        role = member.guild.get_role(role_id)
+            return None
+        key = (guild.id, role_id)
+        role = self._resolved.get(key)
+        if role is None:
+            role = guild.get_role(role_id)
+            if role:
+                self._resolved[key] = role
+        return role
+
+    def _resolve_channel(self, guild: discord.Guild, channel_id: int) -> Optional[discord.abc.GuildChannel]:
+        if not channel_id:
+            return None
+        key = (guild.id, channel_id)
+        channel = self._resolved.get(key)
+        if channel is None:
+            channel = guild.get_channel(channel_id)
+            if channel:
+                self._resolved[key] = channel
+        return channel
+
+    async def assign_role(self, member: discord.Member, role_id: int) -> None:
+        role = self._resolve_role(member.guild, role_id)
         if role:
             with contextlib.suppress(discord.HTTPException):
                 await member.add_roles(role, reason="Auto-verifica LegnaBot")
 
     async def remove_role(self, member: discord.Member, role_id: int) -> None:
-        if not role_id:
-            return
-        role = member.guild.get_role(role_id)
+        role = self._resolve_role(member.guild, role_id)
         if role:
             with contextlib.suppress(discord.HTTPException):
                 await member.remove_roles(role, reason="Auto-verifica LegnaBot")
 
     async def log_staff(self, guild: discord.Guild, message: str) -> None:
         cfg = self.config_manager.config.verification
-        channel = guild.get_channel(cfg.staff_log_channel_id)
+        channel = self._resolve_channel(guild, cfg.staff_log_channel_id)
         if channel and isinstance(channel, discord.TextChannel):
             with contextlib.suppress(discord.HTTPException):
                 await channel.send(message)
@@ -442,12 +707,14 @@ class VerificationCog(commands.Cog):
         if member.guild.id != self.config_manager.config.guild_id:
             return
         await self.assign_role(member, cfg.unverified_role_id)
-        self.pending[member.id] = datetime.now(UTC)
-        channel = member.guild.get_channel(cfg.verify_channel_id)
+        now = datetime.now(UTC)
+        self.pending[member.id] = now
+        heapq.heappush(self._expiry, (now + timedelta(minutes=cfg.timeout_minutes), member.id, now))
+        self._expiry_wakeup.set()
+        channel = self._resolve_channel(member.guild, cfg.verify_channel_id)
         if channel and isinstance(channel, discord.TextChannel):
-            welcome = cfg.welcome_message.replace("{member}", member.mention)
             with contextlib.suppress(discord.HTTPException):
-                await channel.send(welcome)
+                await channel.send(cfg.format_welcome(member.mention))
         await self.bridge.push_event(
             member.guild.id,
             "member_join",
@@ -480,31 +747,54 @@ class VerificationCog(commands.Cog):
             {"member_id": member.id, "by": ctx.author.id},
         )
 
-    @tasks.loop(minutes=1)
-    async def cleanup_task(self) -> None:
+    async def _cleanup_loop(self) -> None:
+        """Espelle chi non completa la verifica, esattamente alla scadenza.
+
+        Le scadenze stanno in un min-heap: il task dorme fino alla prima e
+        viene svegliato dai nuovi join. Le voci di membri già verificati o
+        usciti vengono scartate pigramente al pop.
+        """
         await self.bot.wait_until_ready()
-        cfg = self.config_manager.config.verification
-        timeout = timedelta(minutes=cfg.timeout_minutes)
-        now = datetime.now(UTC)
-        expired = [mid for mid, ts in self.pending.items() if now - ts > timeout]
-        if not expired:
-            return
-        guild = self.bot.get_guild(cfg.guild_id)
-        if not guild:
-            return
-        for member_id in expired:
-            member = guild.get_member(member_id)
-            if not member:
+        while True:
+            if not self._expiry:
+                await self._expiry_wakeup.wait()
+                self._expiry_wakeup.clear()
                 continue
-            with contextlib.suppress(discord.HTTPException):
-                await member.kick(reason="Timeout verifica")
-            await self.log_staff(guild, f"⏱️ {member.mention} rimosso per timeout verifica")
-            self.pending.pop(member_id, None)
-            await self.bridge.push_event(
-                guild.id,
-                "member_timeout",
-                {"member_id": member_id},
-            )
+            delay = (self._expiry[0][0] - datetime.now(UTC)).total_seconds()
+            if delay > 0:
+                with contextlib.suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(self._expiry_wakeup.wait(), timeout=delay)
+                self._expiry_wakeup.clear()
+                continue
+            cfg = self.config_manager.config.verification
+            guild = self.bot.get_guild(cfg.guild_id)
+            if guild is None:
+                # Guild non in cache (disconnessione transitoria): riprova
+                # più tardi senza scartare le scadenze accumulate.
+                await asyncio.sleep(30)
+                continue
+            get_member = guild.get_member
+            pending_pop = self.pending.pop
+            now = datetime.now(UTC)
+            while self._expiry and self._expiry[0][0] <= now:
+                _, member_id, joined_at = heapq.heappop(self._expiry)
+                if self.pending.get(member_id) != joined_at:
+                    # Verificato, uscito, o rientrato dopo questo join: la
+                    # voce si riferisce a un pending ormai superato.
+                    continue
+                member = get_member(member_id)
+                if not member:
+                    pending_pop(member_id, None)
+                    continue
+                with contextlib.suppress(discord.HTTPException):
+                    await member.kick(reason="Timeout verifica")
+                await self.log_staff(guild, f"⏱️ {member.mention} rimosso per timeout verifica")
+                pending_pop(member_id, None)
+                await self.bridge.push_event(
+                    guild.id,
+                    "member_timeout",
+                    {"member_id": member_id},
+                )
 
 
 class ReminderCog(commands.Cog):
@@ -512,55 +802,101 @@ class ReminderCog(commands.Cog):
 
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.reminders: List[Reminder] = []
-        bot.reminders = self.reminders
+        # Min-heap di (trigger_at, seq, Reminder): il prossimo promemoria da
+        # consegnare è sempre in cima, senza scansioni lineari periodiche.
+        self._heap: List[tuple] = []
+        self._seq = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._save_handle: Optional[asyncio.TimerHandle] = None
+        self._dispatch_task: Optional[asyncio.Task] = None
+        bot.reminders = self._heap  # esposto per le metriche (len)
         self._load()
-        self.dispatcher.start()
+
+    async def cog_load(self) -> None:
+        # bot.loop non è accessibile prima del login (discord.py 2.x):
+        # il task parte dal hook asincrono, non dal costruttore.
+        self._dispatch_task = asyncio.create_task(self._dispatch_loop())
 
     def cog_unload(self) -> None:
-        self.dispatcher.cancel()
+        if self._dispatch_task is not None:
+            self._dispatch_task.cancel()
+        if self._save_handle is not None:
+            self._save_handle.cancel()
+            self._save_handle = None
         self._save()
 
+    def _schedule_save(self) -> None:
+        """Coalizza i salvataggi: una sola riscrittura ogni finestra di 2s."""
+        if self._save_handle is None:
+            self._save_handle = self.bot.loop.call_later(2.0, self._do_save)
+
+    def _do_save(self) -> None:
+        self._save_handle = None
+        # Il payload viene costruito qui (heap coerente), la scrittura va al
+        # worker I/O dedicato: un disco lento non ferma gli heartbeat.
+        self.bot.loop.create_task(write_json_atomic(REMINDERS_FILE, self._to_payload()))
+
     def _load(self) -> None:
         if not REMINDERS_FILE.exists():
             return
         try:
-            with REMINDERS_FILE.open("r", encoding="utf-8") as fp:
-                data = json.load(fp)
+            data = orjson.loads(REMINDERS_FILE.read_bytes())
         except Exception as exc:  # pragma: no cover
             log.error("Errore caricando reminders: %s", exc)
             return
-        for entry in data:
-            try:
-                self.reminders.append(Reminder.from_dict(entry))
-            except Exception as exc:
-                log.warning("Reminder non valido scartato: %s", exc)
+        from_iso = datetime.fromisoformat
+        try:
+            # Percorso veloce: file ben formato, niente try/except per riga.
+            reminders = [
+                Reminder(entry["author_id"], entry["channel_id"], entry["message"], from_iso(entry["trigger_at"]))
+                for entry in data
+            ]
+        except Exception:
+            reminders = []
+            for entry in data:
+                try:
+                    reminders.append(Reminder.from_dict(entry))
+                except Exception as exc:
+                    log.warning("Reminder non valido scartato: %s", exc)
+        self._heap.extend((r.trigger_at, next(self._seq), r) for r in reminders)
+        heapq.heapify(self._heap)
+
+    def _to_payload(self) -> List[Dict[str, Any]]:
+        return [item[2].to_dict() for item in self._heap]
 
     def _save(self) -> None:
-        data = [r.to_dict() for r in self.reminders]
-        with REMINDERS_FILE.open("w", encoding="utf-8") as fp:
-            json.dump(data, fp, ensure_ascii=False, indent=2)
+        blob = orjson.dumps(self._to_payload(), option=orjson.OPT_INDENT_2)
+        _write_bytes_atomic(REMINDERS_FILE, blob)
 
-    @tasks.loop(seconds=30)
-    async def dispatcher(self) -> None:
-        await self.bot.wait_until_ready()
-        now = datetime.now(UTC)
-        due = [r for r in self.reminders if r.trigger_at <= now]
-        if not due:
-            return
-        for reminder in due:
-            channel = self.bot.get_channel(reminder.channel_id)
-            if channel and isinstance(channel, discord.TextChannel):
-                with contextlib.suppress(discord.HTTPException):
-                    await channel.send(f"<@{reminder.author_id}> ⏰ {reminder.message}")
-        remaining = [r for r in self.reminders if r.trigger_at > now]
-        self.reminders.clear()
-        self.reminders.extend(remaining)
-        self._save()
+    async def _dispatch_loop(self) -> None:
+        """Dorme esattamente fino al prossimo trigger invece di fare polling.
 
-    @dispatcher.before_loop
-    async def before_dispatcher(self) -> None:
+        L'evento _wakeup viene segnalato quando /remind inserisce una
+        scadenza potenzialmente più vicina della cima dell'heap.
+        """
         await self.bot.wait_until_ready()
+        while True:
+            if not self._heap:
+                await self._wakeup.wait()
+                self._wakeup.clear()
+                continue
+            delay = (self._heap[0][0] - datetime.now(UTC)).total_seconds()
+            if delay > 0:
+                with contextlib.suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                self._wakeup.clear()
+                continue
+            fired = False
+            now = datetime.now(UTC)
+            while self._heap and self._heap[0][0] <= now:
+                _, _, reminder = heapq.heappop(self._heap)
+                fired = True
+                channel = self.bot.get_channel(reminder.channel_id)
+                if channel and isinstance(channel, discord.TextChannel):
+                    with contextlib.suppress(discord.HTTPException):
+                        await channel.send(f"<@{reminder.author_id}> ⏰ {reminder.message}")
+            if fired:
+                self._schedule_save()
 
     @commands.hybrid_command(name="remind", description="Crea un promemoria")
     async def remind(self, ctx: commands.Context, minutes: int, *, message: str) -> None:
@@ -571,57 +907,186 @@ class ReminderCog(commands.Cog):
             message=message,
             trigger_at=trigger,
         )
-        self.reminders.append(reminder)
-        self._save()
+        heapq.heappush(self._heap, (trigger, next(self._seq), reminder))
+        self._wakeup.set()
+        self._schedule_save()
         await ctx.reply(f"Promemoria impostato per {human_delta(trigger)}", mention_author=False)
 
 
 class NotifierCog(commands.Cog):
-    """Invia notifiche quando la dashboard segnala nuovi eventi streaming."""
+    """Invia notifiche quando la dashboard segnala nuovi eventi streaming.
+
+    Niente polling periodico: la dashboard fa una POST firmata (HMAC con la
+    API key) su /hook/stream_event quando osserva un evento reale, e il cog
+    consuma la coda inviando un messaggio per evento.
+    """
 
     def __init__(self, bot: commands.Bot, config_manager: ConfigManager):
         self.bot = bot
         self.config_manager = config_manager
-        self.poll_task.start()
-
-    def cog_unload(self) -> None:
-        self.poll_task.cancel()
-
-    async def fetch_targets(self) -> List[NotifierTarget]:
-        cfg = self.config_manager.config.notifier
-        return cfg.targets if cfg.enabled else []
-
-    @tasks.loop(minutes=10)
-    async def poll_task(self) -> None:
-        await self.bot.wait_until_ready()
-        cfg = self.config_manager.config.notifier
-        if not cfg.enabled or not cfg.notify_channel_id:
-            return
-        channel = self.bot.get_channel(cfg.notify_channel_id)
-        if not isinstance(channel, discord.TextChannel):
+        self._queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue()
+        self._runner: Optional[web.AppRunner] = None
+        self._server_task: Optional[asyncio.Task] = None
+        self._consumer_task: Optional[asyncio.Task] = None
+
+    async def cog_load(self) -> None:
+        # bot.loop non è accessibile prima del login (discord.py 2.x):
+        # i task partono dal hook asincrono, non dal costruttore.
+        self._server_task = asyncio.create_task(self._start_webhook())
+        self._consumer_task = asyncio.create_task(self._consume())
+
+    async def cog_unload(self) -> None:
+        if self._server_task is not None:
+            self._server_task.cancel()
+        if self._consumer_task is not None:
+            self._consumer_task.cancel()
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    def _verify_signature(self, body: bytes, signature: str) -> bool:
+        if not DASHBOARD_API_KEY:
+            # Senza API key il listener è vincolato al solo loopback
+            # (vedi _start_webhook): accettiamo le richieste locali.
+            return True
+        expected = hmac.new(DASHBOARD_API_KEY.encode(), body, hashlib.sha256).hexdigest()
+        return hmac.compare_digest(expected, signature)
+
+    async def _handle_stream_event(self, request: web.Request) -> web.Response:
+        body = await request.read()
+        if not self._verify_signature(body, request.headers.get("X-Signature", "")):
+            return web.Response(status=401)
+        try:
+            payload = orjson.loads(body)
+        except orjson.JSONDecodeError:
+            return web.Response(status=400)
+        await self._queue.put(payload)
+        return web.Response(status=202)
+
+    async def _start_webhook(self) -> None:
+        host = "0.0.0.0"
+        if not DASHBOARD_API_KEY:
+            # Nessuna firma verificabile: non esporre il webhook oltre la
+            # macchina locale, chiunque potrebbe iniettare notifiche (e
+            # ping di ruolo) nel canale notify.
+            log.warning(
+                "DASHBOARD_API_KEY non configurata: webhook notifier "
+                "limitato a 127.0.0.1"
+            )
+            host = "127.0.0.1"
+        app = web.Application()
+        app.router.add_post("/hook/stream_event", self._handle_stream_event)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        # La porta può essere ancora occupata (es. istanza precedente in
+        # chiusura): qualche tentativo prima di arrendersi. Senza questo
+        # try il task morirebbe come eccezione mai osservata e le
+        # notifiche resterebbero mute senza alcuna traccia nei log.
+        for attempt in range(1, 4):
+            try:
+                site = web.TCPSite(self._runner, host, NOTIFIER_WEBHOOK_PORT)
+                await site.start()
+                break
+            except OSError as exc:
+                log.warning(
+                    "Bind del webhook su %s:%s fallito (tentativo %s/3): %s",
+                    host, NOTIFIER_WEBHOOK_PORT, attempt, exc,
+                )
+                await asyncio.sleep(5)
+        else:
+            log.error(
+                "Webhook notifier disattivato: impossibile fare bind su %s:%s",
+                host, NOTIFIER_WEBHOOK_PORT,
+            )
+            await self._runner.cleanup()
+            self._runner = None
             return
-        for target in await self.fetch_targets():
-            text = f"🔔 Nuova attività su {target.platform.title()}: {target.url}"
-            if target.role_id:
-                text = f"<@&{target.role_id}> {text}"
-            with contextlib.suppress(discord.HTTPException):
-                await channel.send(text)
+        log.info("Webhook notifier in ascolto su %s:%s", host, NOTIFIER_WEBHOOK_PORT)
 
-    @poll_task.before_loop
-    async def before_poll(self) -> None:
+    async def _consume(self) -> None:
         await self.bot.wait_until_ready()
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            # Finestra di coalescenza di 1s sull'intero batch: eventi vicini
+            # finiscono nello stesso messaggio invece di una send (e un
+            # bucket REST per-canale) ciascuno. La scadenza è fissa: non si
+            # azzera a ogni evento ricevuto.
+            deadline = loop.time() + 1.0
+            while len(batch) < 10:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout=timeout))
+                except asyncio.TimeoutError:
+                    break
+            cfg = self.config_manager.config.notifier
+            if not cfg.enabled or not cfg.notify_channel_id:
+                continue
+            channel = self.bot.get_channel(cfg.notify_channel_id)
+            if not isinstance(channel, discord.TextChannel):
+                continue
+            lines = []
+            for payload in batch:
+                platform = str(payload.get("platform", ""))
+                url = str(payload.get("url", ""))
+                target = cfg.targets.get((platform, url))
+                text = f"🔔 Nuova attività su {platform.title()}: {url}"
+                if target and target.role_id:
+                    text = f"<@&{target.role_id}> {text}"
+                lines.append(text)
+            chunk = ""
+            for line in lines:
+                if chunk and len(chunk) + 1 + len(line) > 2000:
+                    with contextlib.suppress(discord.HTTPException):
+                        await channel.send(chunk)
+                    chunk = line
+                else:
+                    chunk = f"{chunk}\n{line}" if chunk else line
+            if chunk:
+                with contextlib.suppress(discord.HTTPException):
+                    await channel.send(chunk)
 
 
 # ========================= Bot factory =================================
 
 
+class LegnaBot(commands.Bot):
+    """commands.Bot con registrazione asincrona dei cog.
+
+    In discord.py 2.x add_cog è una coroutine: i cog vanno registrati da
+    setup_hook, altrimenti non vengono mai agganciati e i loro hook
+    cog_load (che avviano i task in background) non girano.
+    """
+
+    def __init__(self, config_manager: ConfigManager, bridge: DashboardBridge, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.config_manager = config_manager
+        self.bridge = bridge
+
+    async def setup_hook(self) -> None:
+        await self.add_cog(DashboardSyncCog(self, self.config_manager, self.bridge))
+        await self.add_cog(VerificationCog(self, self.config_manager, self.bridge))
+        await self.add_cog(ReminderCog(self))
+        await self.add_cog(NotifierCog(self, self.config_manager))
+
+
 def build_bot(config_manager: ConfigManager, bridge: DashboardBridge) -> commands.Bot:
     intents = discord.Intents.default()
     intents.members = True
     intents.message_content = True
     intents.guilds = True
-
-    bot = commands.Bot(command_prefix=lambda bot, msg: config_manager.config.prefix, intents=intents)
+    # Senza questo intent on_presence_update non arriva mai e raw_status
+    # resta "offline" per tutta la cache: il contatore online sarebbe
+    # fermo a zero.
+    intents.presences = True
+
+    bot = LegnaBot(
+        config_manager,
+        bridge,
+        command_prefix=lambda bot, msg: config_manager.config.prefix,
+        intents=intents,
+    )
 
     @bot.event
     async def on_ready() -> None:
@@ -638,11 +1103,6 @@ def build_bot(config_manager: ConfigManager, bridge: DashboardBridge) -> command
         log.exception("Errore comando: %s", error)
         await ctx.reply("Si è verificato un errore imprevisto", mention_author=False)
 
-    bot.add_cog(DashboardSyncCog(bot, config_manager, bridge))
-    bot.add_cog(VerificationCog(bot, config_manager, bridge))
-    bot.add_cog(ReminderCog(bot))
-    bot.add_cog(NotifierCog(bot, config_manager))
-
     @bot.hybrid_command(name="prefix", description="Visualizza o imposta il prefix del bot")
     @commands.has_permissions(manage_guild=True)
     async def prefix_cmd(ctx: commands.Context, new_prefix: Optional[str] = None) -> None:
@@ -650,7 +1110,7 @@ def build_bot(config_manager: ConfigManager, bridge: DashboardBridge) -> command
             await ctx.reply(f"Il prefix attuale è `{config_manager.config.prefix}`", mention_author=False)
             return
         config_manager.config.prefix = new_prefix
-        config_manager.save()
+        config_manager.mark_dirty()
         await ctx.reply(f"Prefix aggiornato a `{new_prefix}`", mention_author=False)
 
     return bot
@@ -670,8 +1130,8 @@ def main() -> None:
     try:
         bot.run(DISCORD_TOKEN)
     finally:
-        if bridge.session and not bridge.session.closed:
-            asyncio.run(bridge.close())
+        if _SHARED_SESSION and not _SHARED_SESSION.closed:
+            asyncio.run(close_http_session())
 
 
 if __name__ == "__main__":